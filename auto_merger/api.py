@@ -26,6 +26,7 @@ import logging
 from auto_merger.github_checker import GitHubStatusChecker
 from auto_merger.gitlab_checker import GitLabStatusChecker
 from auto_merger.config import Config
+from auto_merger.email import EmailSender
 from auto_merger.merger import AutoMerger
 
 
@@ -49,8 +50,9 @@ def merge_request_checker(config: Config, send_email: list[str] | None, json_out
     if json_output:
         gl_checker.save_results()
     if send_email:
-        if not gl_checker.send_results(send_email):
-            return 1
+        with EmailSender(recipient_email=list(send_email)) as sender:
+            if not gl_checker.send_results(sender):
+                return 1
     return ret_value
 
 
@@ -61,37 +63,33 @@ def pull_request_checker(config: Config, send_email: list[str] | None, json_outp
     logger.debug(f"Configuration: {config.__str__()}")
     logger.debug(f"Json path: {json_output}")
     gh_checker = GitHubStatusChecker(config=config, json_output_file=json_output)
-    try:
-        if not gh_checker.check_github_status():
-            return 1
+    if not gh_checker.check_github_status():
+        return 1
 
-        ret_value = gh_checker.check_all_containers()
-        if not ret_value:
-            return ret_value
-        gh_checker.print_blocked_pull_request()
-        gh_checker.print_approval_pull_request()
-        if json_output:
-            gh_checker.save_results()
-        if send_email:
-            if not gh_checker.send_results(send_email):
+    ret_value = gh_checker.check_all_containers()
+    if not ret_value:
+        return ret_value
+    gh_checker.print_blocked_pull_request()
+    gh_checker.print_approval_pull_request()
+    if json_output:
+        gh_checker.save_results()
+    if send_email:
+        with EmailSender(recipient_email=list(send_email)) as sender:
+            if not gh_checker.send_results(sender):
                 return 1
-    finally:
-        gh_checker.clean_dirs()
 
 
 def merger(config: Config, send_email: list[str] | None) -> int:
     logger.debug(f"Configuration: {config.__str__()}")
     auto_merger = AutoMerger(config=config)
     ret_value = auto_merger.check_all_containers()
-    try:
-        if not ret_value:
-            return ret_value
-        is_there_pr_to_merge = auto_merger.print_pull_request_to_merge()
-        if not is_there_pr_to_merge:
-            return 0
-        auto_merger.merge_pull_requests()
-        if send_email:
-            if not auto_merger.send_results(send_email):
+    if not ret_value:
+        return ret_value
+    is_there_pr_to_merge = auto_merger.print_pull_request_to_merge()
+    if not is_there_pr_to_merge:
+        return 0
+    auto_merger.merge_pull_requests()
+    if send_email:
+        with EmailSender(recipient_email=list(send_email)) as sender:
+            if not auto_merger.send_results(sender):
                 return 1
-    finally:
-        auto_merger.clean_dirs()
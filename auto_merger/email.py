@@ -30,6 +30,11 @@ logger = logging.getLogger(__name__)
 
 
 class EmailSender:
+    """
+    Sends emails through local SMTP server.
+    Used as context manager, one SMTP connection is shared by all send_email calls.
+    """
+
     def __init__(self, recipient_email=None):
         if recipient_email is None:
             recipient_email = []
@@ -37,20 +42,49 @@ class EmailSender:
         self.mime_msg = MIMEMultipart()
         self.send_from = ""
         self.send_to = [""]
+        self._smtp = None
+        self._keep_open = False
+
+    def __enter__(self):
+        self._keep_open = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._keep_open = False
+        self.close()
 
-    def create_email_msg(self, subject_msg: str):
+    @property
+    def smtp(self):
+        if not self._smtp:
+            self._smtp = smtplib.SMTP("127.0.0.1")
+        return self._smtp
+
+    def close(self):
+        if not self._smtp:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError) as smtpe:
+            # Connection is already broken, e.g. sendmail failed. Do not hide the original error.
+            logger.debug(f"Closing SMTP connection failed. {smtpe}")
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
+    def create_email_msg(self, subject_msg: str) -> bool:
         if not self.recipient_email:
             logger.error("No recipients specified. Use --send-email")
-            return None
+            return False
+        self.mime_msg = MIMEMultipart()
         self.send_from = "phracek@redhat.com"
-        self.send_to = self.recipient_email
-        if self.recipient_email is not None:
-            self.send_to.extend(self.recipient_email)
+        # Every recipient only once, all of them get the email in one SMTP transaction
+        self.send_to = list(dict.fromkeys(self.recipient_email))
         self.mime_msg["From"] = self.send_from
         self.mime_msg["To"] = ", ".join(self.send_to)
         self.mime_msg["Subject"] = subject_msg
+        return True
 
-    def send_email(self, subject_msg, body=None):
+    def send_email(self, subject_msg, body=None) -> bool:
         if body is None:
             body = []
         whole_body = "".join(body)
@@ -58,9 +92,13 @@ class EmailSender:
             "<html><head><style>table, th, td {border: 1px solid black;}</style></head>"
             f"<body>{whole_body}</body></html>"
         )
-        self.create_email_msg(subject_msg)
+        if not self.create_email_msg(subject_msg):
+            return False
         self.mime_msg.attach(MIMEText(msg, "html"))
-        smtp = smtplib.SMTP("127.0.0.1")
-        smtp.sendmail(self.send_from, self.send_to, self.mime_msg.as_string())
-        smtp.close()
+        try:
+            self.smtp.sendmail(self.send_from, self.send_to, self.mime_msg.as_string())
+        finally:
+            if not self._keep_open:
+                self.close()
         logger.info("Sending email finished")
+        return True
@@ -23,45 +23,54 @@
 # SOFTWARE.
 
 
-import json
-import subprocess
-import os
-import shutil
+import io
 import logging
-from subprocess import CalledProcessError
 
+from collections import defaultdict
 from typing import Any
-from pathlib import Path
+
+import requests
 
 from auto_merger import utils
 from auto_merger.email import EmailSender
+from auto_merger.exceptions import AutoMergerException
 from auto_merger.config import Config
+from auto_merger.github_handler import GitHubHandler
 from auto_merger.pull_request_handler import PullRequestHandler
-from auto_merger.utils import cwd
 
 
 logger = logging.getLogger(__name__)
 
+# Only fields read by the checker are selected, e.g. no review bodies or authors
+PULL_REQUEST_FIELDS = "number title isDraft labels(first: 20) { nodes { name } } reviews(first: 50) { nodes { state } }"
+
 
 class GitHubStatusChecker:
     container_name: str = ""
-    container_dir: Path
-    current_dir = os.getcwd()
 
     def __init__(self, config: Config, json_output_file: str = ""):
         self.config = config
         self.approval_labels = self.config.github["approval_labels"]
         self.blocking_labels = self.config.github["blocker_labels"]
+        self._blocking_set = frozenset(self.blocking_labels)
         self.approvals = self.config.github["approvals"]
         self.namespace = self.config.github["namespace"]
         self.blocked_pr: dict = {}
+        # Numbers of pull requests already stored in self.blocked_pr per container
+        self._blocked_seen: dict[str, set[int]] = defaultdict(set)
         self.pr_to_merge: dict = {}
         self.blocked_body: list = []
         self.approval_body: list = []
         self.repo_data: list = []
-        self.temp_dir: Path
+        self._github_handler = None
         self.json_output_file = json_output_file
 
+    @property
+    def github_handler(self):
+        if not self._github_handler:
+            self._github_handler = GitHubHandler(config=self.config)
+        return self._github_handler
+
     def check_github_status(self) -> bool:
         if "repos" not in self.config.github:
             return False
@@ -69,47 +78,65 @@ class GitHubStatusChecker:
             return False
         return True
 
-    def is_correct_repo(self) -> bool:
-        cmd = ["gh repo view --json name"]
-        repo_name = GitHubStatusChecker.get_gh_json_output(cmd=cmd)
-        logger.debug(repo_name)
-        if repo_name["name"] == self.container_name:
-            return True
-        return False
-
-    @staticmethod
-    def get_gh_json_output(cmd):
-        gh_repo_list = utils.run_command(cmd=cmd, return_output=True)
-        return json.loads(gh_repo_list)
+    def get_graphql_query(self) -> str:
+        """
+        Function builds one GraphQL query for all repositories mentioned in configuration file.
+        Each repository is aliased as 'r<index>' so the response keeps the order of 'repos'.
+        Namespace and repository names are passed as variables, see get_graphql_variables.
+        :return: GraphQL query string
+        """
+        indexes = range(len(self.config.github["repos"]))
+        variables = ", ".join(["$owner: String!"] + [f"$name{index}: String!" for index in indexes])
+        repositories = [
+            f"r{index}: repository(owner: $owner, name: $name{index}) "
+            f"{{ pullRequests(states: OPEN, first: 100) {{ nodes {{ {PULL_REQUEST_FIELDS} }} }} }}"
+            for index in indexes
+        ]
+        return f"query({variables}) {{ {' '.join(repositories)} }}"
 
-    def get_gh_pr_list(self):
-        cmd = ["gh pr list -s open --json number,title,labels,reviews,isDraft"]
-        repo_data_output = GitHubStatusChecker.get_gh_json_output(cmd=cmd)
-        for pr in repo_data_output:
-            if PullRequestHandler.is_draft(pull_request=pr):
-                continue
-            if PullRequestHandler.is_changes_requested(pull_request=pr):
-                continue
-            self.repo_data.append(pr)
+    def get_graphql_variables(self) -> dict:
+        """
+        Function returns values of variables used by get_graphql_query
+        :return: Dictionary with 'owner' and 'name<index>' values
+        """
+        variables = {f"name{index}": container for index, container in enumerate(self.config.github["repos"])}
+        variables["owner"] = self.namespace
+        return variables
 
-    def is_authenticated(self) -> bool:
+    def _graphql_fetch_all(self) -> dict:
         """
-        Function check if user is authenticated
-        :return: True if user is authenticated
-                 False user is not authenticated
+        Function fetches open pull requests for all repositories by one GraphQL request
+        :return: Dictionary 'container': [pull requests]. Repositories that do not exist are missing.
+        :raises AutoMergerException: GraphQL response does not contain any data
         """
-        token = os.getenv("GH_TOKEN")
-        if token is None:
-            logger.critical("Environment variable GH_TOKEN is not specified.")
-            return False
-        cmd = ["gh status"]
-        logger.debug(f"Authentication command: {cmd}")
-        try:
-            utils.run_command(cmd=cmd, return_output=True)
-        except subprocess.CalledProcessError as cpe:
-            logger.error(f"Authentication to GitHub failed. {cpe}")
-            return False
-        return True
+        output = self.github_handler.graphql(query=self.get_graphql_query(), variables=self.get_graphql_variables())
+        for error in output.get("errors", []):
+            # Not existing repositories are reported by check_all_containers
+            if error.get("type") == "NOT_FOUND":
+                logger.debug(f"GraphQL error: {error}")
+            else:
+                logger.error(f"GraphQL error: {error}")
+        data = output.get("data")
+        if not data:
+            raise AutoMergerException("GraphQL response from GitHub does not contain any data.")
+        all_repo_data: dict = {}
+        for index, container in enumerate(self.config.github["repos"]):
+            repository = data.get(f"r{index}")
+            if repository is None:
+                continue
+            repo_data = []
+            for pr in repository["pullRequests"]["nodes"]:
+                pr["number"] = int(pr["number"])
+                pr["labels"] = pr["labels"]["nodes"]
+                pr["reviews"] = pr["reviews"]["nodes"]
+                pr["_label_names"] = PullRequestHandler.get_label_names(pull_request=pr)
+                if PullRequestHandler.is_draft(pull_request=pr):
+                    continue
+                if PullRequestHandler.is_changes_requested(pull_request=pr):
+                    continue
+                repo_data.append(pr)
+            all_repo_data[container] = repo_data
+        return all_repo_data
 
     def add_blocked_pull_request(self, pull_request=None) -> Any:
         """
@@ -120,12 +147,10 @@ class GitHubStatusChecker:
         """
         if pull_request is None:
             pull_request = {}
-        present = False
-        for stored_pr in self.blocked_pr[self.container_name]:
-            if int(stored_pr["number"]) == int(pull_request["number"]):
-                present = True
-        if present:
+        number = pull_request["number"]
+        if number in self._blocked_seen[self.container_name]:
             return
+        self._blocked_seen[self.container_name].add(number)
         self.blocked_pr[self.container_name].append(
             {
                 "number": pull_request["number"],
@@ -136,24 +161,22 @@ class GitHubStatusChecker:
         logger.debug(f"PR {pull_request['number']} added to blocked")
         return
 
-    def check_blocked_labels(self):
+    def classify_prs(self) -> bool:
+        """
+        Function goes through self.repo_data once. Pull request with any blocking label
+        is added to self.blocked_pr, otherwise it is added to self.pr_to_merge
+        in case it has enough approvals.
+        :return: True if there is at least one pull request to merge
+                 False otherwise
+        """
+        pr_to_merge: bool = False
         for pr in self.repo_data:
             logger.debug(f"Checking PR {pr['number']}")
             if "labels" not in pr:
                 continue
-            for label in pr["labels"]:
-                if label["name"] not in self.blocking_labels:
-                    continue
+            if PullRequestHandler.get_label_names(pull_request=pr) & self._blocking_set:
                 logger.info(f"Add PR'{pr['number']}' of '{self.container_name}' to blocked PRs.")
                 self.add_blocked_pull_request(pull_request=pr)
-
-    def check_pr_to_merge(self) -> bool:
-        if len(self.repo_data) == 0:
-            return False
-        pr_to_merge: bool = False
-        for pr in self.repo_data:
-            logger.debug(f"PR status: {pr}")
-            if not PullRequestHandler.check_labels_to_merge(pull_request=pr, blocking_labels=self.blocking_labels):
                 continue
             if "reviews" not in pr:
                 continue
@@ -161,64 +184,48 @@ class GitHubStatusChecker:
             if approval_count < self.approvals:
                 logger.debug(f"Not enough approvals: {approval_count}. Should be at least {self.approvals}")
                 continue
-            self.pr_to_merge[self.container_name] = {
-                "number": pr["number"],
-                "approvals": approval_count,
-                "title": pr["title"],
-            }
+            self.pr_to_merge[self.container_name].append(
+                {
+                    "number": pr["number"],
+                    "approvals": approval_count,
+                    "pr_dict": {"title": pr["title"]},
+                }
+            )
             pr_to_merge = True
         return pr_to_merge
 
-    def clone_repo(self):
-        self.temp_dir = utils.temporary_dir()
-        self.container_dir = Path(self.temp_dir) / f"{self.container_name}"
-        try:
-            utils.run_command(
-                f"gh repo clone https://github.com/{self.namespace}/{self.container_name} {self.container_dir}"
-            )
-        except CalledProcessError as cpe:
-            logger.error(cpe.stderr)
-            return False
-        return True
-
     def merge_pull_requests(self):
         for pr in self.pr_to_merge:
             logger.debug(f"PR to merge {pr} in repo {self.container_name}.")
 
-    def clean_dirs(self):
-        os.chdir(self.current_dir)
-        if Path(self.temp_dir).exists():
-            shutil.rmtree(self.temp_dir)
-
     def check_all_containers(self) -> bool:
-        if not self.is_authenticated():
+        if not self.github_handler.check_authentication():
+            return False
+        try:
+            all_repo_data = self._graphql_fetch_all()
+        except requests.RequestException as rqe:
+            logger.error(f"Getting pull requests from GitHub failed. {rqe}")
+            return False
+        except AutoMergerException as ame:
+            logger.error(f"Getting pull requests from GitHub failed. {ame}")
             return False
         for container in self.config.github["repos"]:
             logger.info(f"Let's check repository in {self.namespace}/{container}")
             self.container_name = container
-            self.repo_data = []
-            if not self.clone_repo():
+            if self.container_name not in all_repo_data:
+                logger.error(f"This is not correct repo {self.container_name}.")
                 continue
-            with cwd(self.container_dir):
-                if not self.is_correct_repo():
-                    logger.error(f"This is not correct repo {self.container_name}.")
-                    self.clean_dirs()
-                    continue
-                if self.container_name not in self.blocked_pr:
-                    self.blocked_pr[self.container_name] = []
-                if self.container_name not in self.pr_to_merge:
-                    self.pr_to_merge[self.container_name] = []
-                try:
-                    self.get_gh_pr_list()
-                    self.check_blocked_labels()
-                    self.check_pr_to_merge()
-                except subprocess.CalledProcessError:
-                    logger.error(f"Something went wrong {self.container_name}.")
-                    continue
+            self.repo_data = all_repo_data[self.container_name]
+            if self.container_name not in self.blocked_pr:
+                self.blocked_pr[self.container_name] = []
+            if self.container_name not in self.pr_to_merge:
+                self.pr_to_merge[self.container_name] = []
+            self.classify_prs()
         return True
 
     def get_blocked_labels(self, pr_dict) -> list[str]:
-        return [lbl["name"] for lbl in pr_dict if lbl["name"] in self.blocking_labels]
+        names = PullRequestHandler.get_label_names(pull_request=pr_dict)
+        return [label for label in self.blocking_labels if label in names]
 
     def print_blocked_pull_request(self) -> bool:
         logger.warning("SUMMARY OF BLOCKED PULL REQUESTS")
@@ -232,56 +239,74 @@ class GitHubStatusChecker:
         string_to_print = f"Pull requests that are blocked by labels [{', '.join(self.blocking_labels)}]"
 
         logger.info(f"SUMMARY\n{string_to_print}\n")
-        self.blocked_body.append(f"{string_to_print}</b><br><br>")
+        buf = io.StringIO()
+        write = buf.write
+        write(f"{string_to_print}</b><br><br>")
+        get_blocked_labels = self.get_blocked_labels
+        namespace = self.namespace
+        # Summary is logged by one call, lines are formatted only if they are going to be printed
+        log_enabled = logger.isEnabledFor(logging.WARNING)
+        lines: list[str] = []
 
         for container, pull_requests in self.blocked_pr.items():
             if not pull_requests:
                 continue
-            logger.warning(f"\n{container}\n")
-            self.blocked_body.append(f"<b>{container}<b>:")
-            self.blocked_body.append("<table><tr><th>Pull request URL</th><th>Title</th><th>Missing labels</th></tr>")
+            if log_enabled:
+                lines.append(f"\n{container}\n")
+            url_prefix = f"https://github.com/{namespace}/{container}/pull/"
+            write(f"<b>{container}<b>:")
+            write("<table><tr><th>Pull request URL</th><th>Title</th><th>Missing labels</th></tr>")
             for pr in pull_requests:
-                logger.debug(f"Print PR {pr}.")
-                blocked_labels = self.get_blocked_labels(pr["labels"])
-                logger.warning(
-                    f"https://github.com/{self.namespace}/{container}/pull/{pr['number']} {' '.join(blocked_labels)}"
+                blocked_labels = " ".join(get_blocked_labels(pr))
+                if log_enabled:
+                    lines.append(f"{url_prefix}{pr['number']} {blocked_labels}")
+                write(
+                    f"<tr><td>{url_prefix}{pr['number']}</td><td>{pr['title']}</td>"
+                    f"<td><p style='color:red;'>{blocked_labels}</p></td></tr>"
                 )
-                self.blocked_body.append(
-                    f"<tr><td>https://github.com/{self.namespace}/{container}/pull/{pr['number']}</td>"
-                    f"<td>{pr['title']}</td><td><p style='color:red;'>"
-                    f"{' '.join(blocked_labels)}</p></td></tr>"
-                )
-            self.blocked_body.append("</table><br><br>")
+            write("</table><br><br>")
+        if lines:
+            logger.warning("\n".join(lines))
+        self.blocked_body = [buf.getvalue()]
         return True
 
     def print_approval_pull_request(self):
         # Do not print anything in case we do not have PR.
         if not [x for x in self.pr_to_merge if self.pr_to_merge[x]]:
             return
-        logger.warning("SUMMARY\n\nPull requests that can be merged approvals")
-        self.approval_body.append(f"Pull requests that can be merged or missing {self.approvals} approvals")
-        for container, pr in self.pr_to_merge.items():
-            if not pr:
+        lines: list[str] = ["SUMMARY\n\nPull requests that can be merged approvals"]
+        log_enabled = logger.isEnabledFor(logging.WARNING)
+        buf = io.StringIO()
+        write = buf.write
+        approvals = self.approvals
+        namespace = self.namespace
+        write(f"Pull requests that can be merged or missing {approvals} approvals")
+        for container, pull_requests in self.pr_to_merge.items():
+            if not pull_requests:
                 continue
-            self.approval_body.append("<table><tr><th>Pull request URL</th><th>Title</th><th>Approval status</th></tr>")
-            if int(pr["approvals"]) >= self.approvals:
-                result_pr = "CAN BE MERGED"
-            else:
-                result_pr = f"Missing {self.approvals-int(pr['approvals'])} APPROVAL"
-            logger.warning(f"https://github.com/{self.namespace}/{container}/pull/{pr['number']} - {result_pr}")
-            self.approval_body.append(
-                f"<tr><td>https://github.com/{self.namespace}/{container}/pull/{pr['number']}</td>"
-                f"<td>{pr['pr_dict']['title']}</td><td><p style='color:red;'>{result_pr}</p></td></tr>"
-            )
-            self.approval_body.append("</table><br>")
+            url_prefix = f"https://github.com/{namespace}/{container}/pull/"
+            write("<table><tr><th>Pull request URL</th><th>Title</th><th>Approval status</th></tr>")
+            for pr in pull_requests:
+                if pr["approvals"] >= approvals:
+                    result_pr = "CAN BE MERGED"
+                else:
+                    result_pr = f"Missing {approvals - pr['approvals']} APPROVAL"
+                if log_enabled:
+                    lines.append(f"{url_prefix}{pr['number']} - {result_pr}")
+                write(
+                    f"<tr><td>{url_prefix}{pr['number']}</td>"
+                    f"<td>{pr['pr_dict']['title']}</td><td><p style='color:red;'>{result_pr}</p></td></tr>"
+                )
+            write("</table><br>")
+        logger.warning("\n".join(lines))
+        self.approval_body = [buf.getvalue()]
 
     def save_results(self):
         return utils.save_json_file(json_file_path=self.json_output_file, json_dict=self.blocked_pr)
 
-    def send_results(self, recipients):
-        logger.debug(f"Recipients are: {recipients}")
-        if not recipients:
-            return
-        sender_class = EmailSender(recipient_email=list(recipients))
+    def send_results(self, sender: EmailSender) -> bool:
+        logger.debug(f"Recipients are: {sender.recipient_email}")
+        if not sender.recipient_email:
+            return False
         subject_msg = f"Pull request statuses for organization https://github.com/{self.namespace}"
-        sender_class.send_email(subject_msg, self.blocked_body + self.approval_body)
+        return sender.send_email(subject_msg, self.blocked_body + self.approval_body)
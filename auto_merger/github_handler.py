@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2024 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+import logging
+import os
+
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from auto_merger.config import Config
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+# Size of connection pool. It should not be lower than number of threads using the session.
+POOL_SIZE = 8
+ETAG_CACHE_FILE = Path.home() / ".cache" / "auto-merger" / "etags.json"
+
+
+class GitHubHandler:
+    def __init__(self, config: Config):
+        self.config = config
+        self.namespace = self.config.github["namespace"]
+        self._session = None
+        self.token = ""
+        self.etag_cache_file: Path = ETAG_CACHE_FILE
+        # URL -> {"etag": ETag header from GitHub, "data": parsed response}
+        self.etag_cache: dict = {}
+        # URLs requested in this run. Only these are stored, so entries of closed pull requests expire.
+        self.used_urls: set[str] = set()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        One session is used for all requests, so the TCP and TLS connection to GitHub is reused.
+        """
+        if not self._session:
+            self._session = requests.Session()
+            self._session.headers.update(
+                {
+                    "Authorization": f"Bearer {self.token.strip()}",
+                    "Accept": "application/vnd.github+json",
+                }
+            )
+            self._session.mount("https://", HTTPAdapter(pool_maxsize=POOL_SIZE))
+        return self._session
+
+    def check_authentication(self) -> bool:
+        """
+        Function check if user is authenticated
+        :return: True if user is authenticated
+                 False user is not authenticated
+        """
+        self.token = os.getenv("GH_TOKEN", "")
+        if not self.token:
+            logger.critical("Environment variable GH_TOKEN is not specified.")
+            return False
+        try:
+            ret = self.session.get(f"{GITHUB_API_URL}/user")
+            ret.raise_for_status()
+        except requests.RequestException as rqe:
+            logger.error(f"Authentication to GitHub failed. {rqe}")
+            return False
+        logger.debug(f"Authenticated to GitHub as {ret.json()['login']}")
+        return True
+
+    def load_etag_cache(self):
+        if not self.etag_cache_file.is_file():
+            return
+        try:
+            self.etag_cache = json.loads(self.etag_cache_file.read_text())
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Cannot load ETag cache '{self.etag_cache_file}': {ex}")
+            self.etag_cache = {}
+
+    def save_etag_cache(self) -> bool:
+        try:
+            self.etag_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            used_cache = {url: entry for url, entry in self.etag_cache.items() if url in self.used_urls}
+            self.etag_cache_file.write_text(json.dumps(used_cache))
+        except OSError as ex:
+            logger.warning(f"Cannot save ETag cache '{self.etag_cache_file}': {ex}")
+            return False
+        logger.debug(f"ETag cache was stored to {self.etag_cache_file}")
+        return True
+
+    def get_cached(self, url: str, params: dict, parse: Callable) -> list:
+        """
+        Function sends conditional GET request. In case GitHub responds '304 Not Modified'
+        the cached data are returned. Such responses do not count against the rate limit.
+        :param url: GitHub API URL
+        :param params: query parameters
+        :param parse: function that converts JSON response into data stored in cache
+        :return: parsed data
+        """
+        self.used_urls.add(url)
+        headers = {}
+        cached = self.etag_cache.get(url)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        ret = self.session.get(url, params=params, headers=headers)
+        if ret.status_code == 304:
+            if not cached:
+                # raise_for_status() does not raise for 3xx and the response has no body
+                raise requests.HTTPError(f"{url} returned 304 Not Modified without cached data.", response=ret)
+            logger.debug(f"{url} was not modified. Using cached data.")
+            return cached["data"]
+        ret.raise_for_status()
+        data = parse(ret.json())
+        if "ETag" in ret.headers:
+            self.etag_cache[url] = {"etag": ret.headers["ETag"], "data": data}
+        return data
+
+    def graphql(self, query: str, variables: dict = None) -> dict:
+        ret = self.session.post(GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables or {}})
+        ret.raise_for_status()
+        return ret.json()
+
+    def get_pull_requests(self, reponame: str) -> list[dict]:
+        """
+        Function returns open pull requests in the same format as 'gh pr list --json'
+        with fields 'number', 'title', 'isDraft', 'createdAt' and 'labels'.
+        Reviews are not part of the REST response, see get_pull_request_reviews.
+        :param reponame: repository name in namespace
+        :return: list of pull request dictionaries
+        """
+        url = f"{GITHUB_API_URL}/repos/{self.namespace}/{reponame}/pulls"
+        logger.debug(f"Get pull requests from {url}")
+        return self.get_cached(
+            url,
+            params={"state": "open", "per_page": 100},
+            parse=lambda pulls: [
+                {
+                    "number": pr["number"],
+                    "title": pr["title"],
+                    "isDraft": pr["draft"],
+                    "createdAt": pr["created_at"],
+                    "labels": [{"name": label["name"]} for label in pr["labels"]],
+                }
+                for pr in pulls
+            ],
+        )
+
+    def get_pull_request_reviews(self, reponame: str, number: int) -> list[dict]:
+        url = f"{GITHUB_API_URL}/repos/{self.namespace}/{reponame}/pulls/{number}/reviews"
+        logger.debug(f"Get reviews from {url}")
+        return self.get_cached(
+            url,
+            params={"per_page": 100},
+            parse=lambda reviews: [{"state": review["state"]} for review in reviews],
+        )
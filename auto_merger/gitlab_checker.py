@@ -23,7 +23,6 @@
 # SOFTWARE.
 
 
-import os
 import logging
 
 from typing import Any
@@ -45,12 +44,12 @@ logger = logging.getLogger(__name__)
 class GitLabStatusChecker:
     container_name: str = ""
     container_dir: Path
-    current_dir = os.getcwd()
 
     def __init__(self, config: Config, json_output_file: str = ""):
         self.config = config
         self.approval_labels = self.config.gitlab["approval_labels"]
         self.blocking_labels = self.config.gitlab["blocker_labels"]
+        self._blocking_set = frozenset(self.blocking_labels)
         self.approvals = self.config.gitlab["approvals"]
         if "namespace" in self.config.gitlab:
             self.namespace = self.config.gitlab["namespace"]
@@ -115,12 +114,10 @@ class GitLabStatusChecker:
             if not mr.labels:
                 self.add_blocked_pull_request(merge_request=mr)
                 continue
-            logger.debug(self.blocking_labels)
-            for label in mr.labels:
-                if label not in self.blocking_labels:
-                    continue
-                logger.info(f"Add PR {mr.iid} to blocked PRs.")
-                self.add_blocked_pull_request(merge_request=mr)
+            if self._blocking_set.isdisjoint(mr.labels):
+                continue
+            logger.info(f"Add PR {mr.iid} to blocked PRs.")
+            self.add_blocked_pull_request(merge_request=mr)
 
     def check_pr_to_merge(self) -> bool:
         if len(self.repo_data) == 0:
@@ -185,27 +182,27 @@ class GitLabStatusChecker:
         logger.warning(
             f"SUMMARY\n\nGitLab merge requests that are blocked by labels [{', '.join(self.blocking_labels)}]"
         )
-        self.blocked_body.append(
-            f"GitLab merge requests that are blocked by labels <b>[{', '.join(self.blocking_labels)}]</b><br><br>"
-        )
+        append = self.blocked_body.append
+        gitlab_url = self.config.gitlab["url"]
+        append(f"GitLab merge requests that are blocked by labels <b>[{', '.join(self.blocking_labels)}]</b><br><br>")
 
         for container, merge_requests in self.blocked_mr.items():
             if not merge_requests:
                 continue
             logger.info(f"\n{container}\n------\n")
-            self.blocked_body.append(f"<b>{container}<b>:")
-            self.blocked_body.append("<table><tr><th>Merge request URL</th><th>Title</th><th>Missing labels</th></tr>")
+            append(f"<b>{container}<b>:")
+            append("<table><tr><th>Merge request URL</th><th>Title</th><th>Missing labels</th></tr>")
             for mr in merge_requests:
                 blocked_labels = self.get_blocked_labels(mr["labels"])
                 if blocked_labels == "":
                     blocked_labels = "No labels to unblock this merge request."
-                logger.info(f"{self.config.gitlab['url']}/{container}/-/merge_requests/{mr['number']} '{mr['title']}'")
-                self.blocked_body.append(
-                    f"<tr><td>{self.config.gitlab['url']}/{container}/-/merge_requests/{mr['number']}</td>"
+                logger.info(f"{gitlab_url}/{container}/-/merge_requests/{mr['number']} '{mr['title']}'")
+                append(
+                    f"<tr><td>{gitlab_url}/{container}/-/merge_requests/{mr['number']}</td>"
                     f"<td>{mr['title']}</td><td><p style='color:red;'>"
                     f"'{blocked_labels}'</p></td></tr>"
                 )
-        self.blocked_body.append("</table><br><br>")
+        append("</table><br><br>")
         return True
 
     def print_approval_pull_request(self):
@@ -232,10 +229,9 @@ class GitLabStatusChecker:
     def save_results(self):
         return utils.save_json_file(json_file_path=self.json_output_file, json_dict=self.blocked_mr)
 
-    def send_results(self, recipients):
-        logger.debug(f"Recipients are: {recipients}")
-        if not recipients:
-            return
-        sender_class = EmailSender(recipient_email=list(recipients))
+    def send_results(self, sender: EmailSender) -> bool:
+        logger.debug(f"Recipients are: {sender.recipient_email}")
+        if not sender.recipient_email:
+            return False
         subject_msg = f"Pull request statuses for organization https://github.com/{self.namespace}"
-        sender_class.send_email(subject_msg, self.blocked_body + self.approval_body)
+        return sender.send_email(subject_msg, self.blocked_body + self.approval_body)
@@ -23,104 +23,88 @@
 # SOFTWARE.
 
 
-import json
 import logging
 import subprocess
-import os
-import shutil
 
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 
 from auto_merger import utils
 from auto_merger.config import Config
-from auto_merger.utils import cwd
 from auto_merger.email import EmailSender
+from auto_merger.github_handler import GitHubHandler, POOL_SIZE
 from auto_merger.pull_request_handler import PullRequestHandler
 
 
 logger = logging.getLogger(__name__)
 
+# Repositories are checked in parallel, each check waits mostly for GitHub
+MAX_WORKERS = POOL_SIZE
 
-class AutoMerger:
-    container_name: str = ""
-    container_dir: Path
-    current_dir = os.getcwd()
 
+class AutoMerger:
     def __init__(self, config: Config):
         self.config = config
         self.approval_labels = self.config.github["approval_labels"]
         self.blocking_labels = self.config.github["blocker_labels"]
+        self._approval_set = frozenset(self.approval_labels)
         self.approvals = self.config.github["approvals"]
         self.namespace = self.config.github["namespace"]
         self.pr_lifetime = self.config.github["pr_lifetime"]
         self.pr_to_merge: dict = {}
         self.approval_body: list = []
-        self.repo_data: list = []
-        self.temp_dir = ""
-
-    def is_correct_repo(self) -> bool:
-        cmd = ["gh repo view --json name"]
-        repo_name = AutoMerger.get_gh_json_output(cmd=cmd)
-        logger.debug(repo_name)
-        if repo_name["name"] == self.container_name:
-            return True
-        return False
+        self._github_handler = None
 
-    @staticmethod
-    def get_gh_json_output(cmd):
-        gh_repo_list = utils.run_command(cmd=cmd, return_output=True)
-        return json.loads(gh_repo_list)
+    @property
+    def github_handler(self):
+        if not self._github_handler:
+            self._github_handler = GitHubHandler(config=self.config)
+        return self._github_handler
 
-    def get_gh_pr_list(self):
-        cmd = ["gh pr list -s open --json number,title,labels,reviews,isDraft,createdAt"]
-        repo_data_output = AutoMerger.get_gh_json_output(cmd=cmd)
+    def get_gh_pr_list(self, container: str) -> list:
+        repo_data_output = self.github_handler.get_pull_requests(reponame=container)
+        repo_data = []
         for pr in repo_data_output:
+            # Copy, the original dictionaries are stored in ETag cache
+            pr = dict(pr, _label_names=PullRequestHandler.get_label_names(pull_request=pr))
             if PullRequestHandler.is_draft(pull_request=pr):
                 continue
             if PullRequestHandler.is_changes_requested(pull_request=pr):
                 continue
-            self.repo_data.append(pr)
+            repo_data.append(pr)
+        return repo_data
 
-    def is_authenticated(self) -> bool:
-        token = os.getenv("GH_TOKEN")
-        if token == "":
-            logger.error("Environment variable GH_TOKEN is not specified.")
-            return False
-        cmd = ["gh status"]
-        logger.debug(f"Authentication command: {cmd}")
-        try:
-            utils.run_command(cmd=cmd, return_output=True)
-        except subprocess.CalledProcessError as cpe:
-            logger.error(f"Authentication to GitHub failed. {cpe}")
-            return False
-        return True
-
-    def check_labels_to_merge(self, pr) -> bool:
+    def check_labels_to_merge(self, container: str, pr) -> bool:
         if "labels" not in pr:
             return False
-        logger.debug(f"check_labels_to_merge for {self.container_name}: {pr['labels']} and {self.approval_labels}")
-        for label in pr["labels"]:
-            if label["name"] in self.approval_labels:
-                logger.debug(f"Add '{pr['number']}' to approved PRs.")
-                return True
+        logger.debug(f"check_labels_to_merge for {container}: {pr['labels']} and {self.approval_labels}")
+        if PullRequestHandler.get_label_names(pull_request=pr) & self._approval_set:
+            logger.debug(f"Add '{pr['number']}' to approved PRs.")
+            return True
         return False
 
-    def check_pr_to_merge(self) -> bool:
-        if len(self.repo_data) == 0:
-            return False
-        for pr in self.repo_data:
-            if not self.check_labels_to_merge(pr):
-                logger.debug(
-                    f"check_pr_to_merge for {self.container_name}: " f"pull request {pr['number']} did not met labels."
-                )
+    def check_pr_to_merge(self, container: str, repo_data: list) -> list:
+        """
+        Function returns pull requests from 'repo_data' that can be merged.
+        It does not modify the instance, so it is safe to call it from several threads.
+        :param container: repository name
+        :param repo_data: list of open pull requests in repository
+        :return: list of dictionaries with 'number', 'approvals' and 'title'
+        """
+        pr_to_merge: list = []
+        for pr in repo_data:
+            if not self.check_labels_to_merge(container, pr):
+                logger.debug(f"check_pr_to_merge for {container}: pull request {pr['number']} did not met labels.")
                 continue
-            if "reviews" not in pr:
+            # Reviews are fetched only for pull requests that have approval labels
+            reviews = self.github_handler.get_pull_request_reviews(reponame=container, number=pr["number"])
+            if not reviews:
                 logger.debug(
-                    f"check_pr_to_merge for {self.container_name}:"
-                    f" pull request {pr['number']} does not have reviews yet."
+                    f"check_pr_to_merge for {container}: pull request {pr['number']} does not have reviews yet."
                 )
                 continue
-            approval_count = PullRequestHandler.check_pr_approvals(reviews_to_check=pr["reviews"])
+            approval_count = PullRequestHandler.check_pr_approvals(reviews_to_check=reviews)
             if approval_count < self.approvals:
                 logger.debug(f"Not enough approvals: {approval_count}. Should be at least {self.approvals}")
                 continue
@@ -128,42 +112,25 @@ class AutoMerger:
             if not PullRequestHandler.check_pr_lifetime(pull_request=pr):
                 logger.debug(f"Pr is not valid for more  then {self.config.github['pr_lifetime']}")
                 continue
-            self.pr_to_merge[self.container_name].append(
+            pr_to_merge.append(
                 {
                     "number": pr["number"],
                     "approvals": approval_count,
                     "title": pr["title"],
                 }
             )
-        logger.debug(self.pr_to_merge)
-        return True
-
-    def clone_repo(self):
-        utils.run_command(
-            f"gh repo clone https://github.com/{self.namespace}/{self.container_name} "
-            f"{self.temp_dir}/{self.container_name}"
-        )
-        self.container_dir = Path(self.temp_dir) / f"{self.container_name}"
+        logger.debug(f"Pull requests to merge in {container}: {pr_to_merge}")
+        return pr_to_merge
 
     def merge_pull_requests(self):
         for container in self.config.github["repos"]:
-            self.container_name = container
-            self.container_dir = Path(self.temp_dir) / f"{self.container_name}"
-            with cwd(self.container_dir) as _:
-                self.merge_pr()
-        os.chdir(self.current_dir)
-        self.clean_dirs()
-
-    def clean_dirs(self):
-        os.chdir(self.current_dir)
-        if self.container_dir.exists():
-            shutil.rmtree(self.container_dir)
-        if Path(self.temp_dir).exists():
-            shutil.rmtree(self.temp_dir)
-
-    def merge_pr(self):
-        for pr in self.pr_to_merge[self.container_name]:
-            if int(pr["approvals"]) < self.approvals:
+            if container not in self.pr_to_merge:
+                continue
+            self.merge_pr(container)
+
+    def merge_pr(self, container: str):
+        for pr in self.pr_to_merge[container]:
+            if pr["approvals"] < self.approvals:
                 logger.debug(
                     f"Automerger does not have enough approvals '{pr['approvals']}' against '{self.approvals}' "
                 )
@@ -171,36 +138,45 @@ class AutoMerger:
 
             logger.info(f"Let's try to merge {pr['number']}....")
             try:
-                output = utils.run_command(f"gh pr merge --rebase --auto {pr['number']}", return_output=True)
+                output = utils.run_command(
+                    f"gh pr merge --repo {self.namespace}/{container} --rebase --auto {pr['number']}",
+                    return_output=True,
+                )
                 logger.debug(f"The output from merging command '{output}'")
                 logger.info(f"Pull request {pr['number']} was merged.")
             except subprocess.CalledProcessError as cpe:
                 logger.error(f"Merging pr {pr} failed with reason {cpe.output}")
                 continue
 
+    def _check_one(self, container: str) -> tuple[str, list | None]:
+        """
+        Function checks one repository and returns pull requests that can be merged.
+        :param container: repository name
+        :return: tuple (container, list of pull requests to merge). The list is None if checking failed.
+        """
+        logger.info(f"Let's check repository in {self.namespace}/{container}")
+        try:
+            repo_data = self.get_gh_pr_list(container)
+            return container, self.check_pr_to_merge(container, repo_data)
+        except requests.RequestException:
+            logger.error(f"Something went wrong {container}.")
+            return container, None
+
     def check_all_containers(self) -> bool:
-        if not self.is_authenticated():
+        if not self.github_handler.check_authentication():
             return False
-        self.temp_dir = utils.temporary_dir()
-        for container in self.config.github["repos"]:
-            self.container_name = container
-            self.repo_data = []
-            self.clone_repo()
-            if not self.container_dir.exists():
+        self.github_handler.load_etag_cache()
+        try:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                results = list(executor.map(self._check_one, self.config.github["repos"]))
+        finally:
+            self.github_handler.save_etag_cache()
+        for container, pr_to_merge in results:
+            if container not in self.pr_to_merge:
+                self.pr_to_merge[container] = []
+            if pr_to_merge is None:
                 continue
-            with cwd(self.container_dir) as _:
-                if not self.is_correct_repo():
-                    logger.error(f"This is not correct repo {self.container_name}.")
-                    continue
-                if self.container_name not in self.pr_to_merge:
-                    self.pr_to_merge[self.container_name] = []
-                try:
-                    self.get_gh_pr_list()
-                    self.check_pr_to_merge()
-                except subprocess.CalledProcessError:
-                    logger.error(f"Something went wrong {self.container_name}.")
-                    continue
-        os.chdir(self.current_dir)
+            self.pr_to_merge[container].extend(pr_to_merge)
         logger.debug(f"List of all PRs to merge: '{self.pr_to_merge}'")
         return True
 
@@ -212,28 +188,29 @@ class AutoMerger:
         if not is_there_something:
             logger.info("There is nothing to send or merge.")
             return False
-        self.approval_body.append("Pull requests are merged.")
-        self.approval_body.append("<table><tr><th>Pull request URL</th><th>Title</th><th>Approval status</th></tr>")
+        append = self.approval_body.append
+        namespace = self.namespace
+        append("Pull requests are merged.")
+        append("<table><tr><th>Pull request URL</th><th>Title</th><th>Approval status</th></tr>")
         for cont, pr_list in self.pr_to_merge.items():
             logger.debug(f"Print info about {cont} and {pr_list}.")
             for pr in pr_list:
                 if not pr:
                     continue
-                logger.info(f"https://github.com/{self.namespace}/{cont}/pull/{pr['number']} -> CAN BE MERGED")
-                self.approval_body.append(
-                    f"<tr><td> https://github.com/{self.namespace}/{cont}/pull/{pr['number']} </td>"
+                logger.info(f"https://github.com/{namespace}/{cont}/pull/{pr['number']} -> CAN BE MERGED")
+                append(
+                    f"<tr><td> https://github.com/{namespace}/{cont}/pull/{pr['number']} </td>"
                     f"<td> {pr['title']} </td><td><p style='color:red;'> CAN BE MERGED </p></td></tr>"
                 )
-        self.approval_body.append("</table><br>")
+        append("</table><br>")
         return True
 
-    def send_results(self, recipients):
-        logger.debug(f"Recipients are: {recipients}")
-        if not recipients:
+    def send_results(self, sender: EmailSender) -> bool:
+        logger.debug(f"Recipients are: {sender.recipient_email}")
+        if not sender.recipient_email:
             return False
-        sender_class = EmailSender(recipient_email=list(recipients))
         subject_msg = "Merge request update"
-        if self.approval_body:
-            sender_class.send_email(subject_msg, self.approval_body)
-        else:
+        if not self.approval_body:
             logger.info("Nothing to send.")
+            return True
+        return sender.send_email(subject_msg, self.approval_body)
@@ -31,6 +31,18 @@ logger = logging.getLogger(__name__)
 
 
 class PullRequestHandler:
+    @staticmethod
+    def get_label_names(pull_request: dict) -> frozenset:
+        """
+        Function returns names of pull request labels.
+        Pull requests loaded from GitHub have them precomputed in '_label_names'.
+        :param pull_request: pull request dictionary with labels
+        :return: frozenset with label names
+        """
+        if "_label_names" in pull_request:
+            return pull_request["_label_names"]
+        return frozenset(label["name"] for label in pull_request.get("labels", ()))
+
     @staticmethod
     def check_pr_lifetime(pull_request: dict = None, pr_lifetime: int = 0) -> bool:
         if pull_request is None:
@@ -46,30 +58,16 @@ class PullRequestHandler:
         return False
 
     @staticmethod
-    def is_draft(pull_request: dict):
-        if "isDraft" in pull_request:
-            if pull_request["isDraft"] in ["True", "true"]:
-                return True
-        return False
+    def is_draft(pull_request: dict) -> bool:
+        return bool(pull_request.get("isDraft"))
 
     @staticmethod
     def check_pr_approvals(reviews_to_check: list) -> int:
-        if not reviews_to_check:
-            return 0
-        approval_cnt = 0
-        for review in reviews_to_check:
-            if review["state"] == "APPROVED":
-                approval_cnt += 1
-        return approval_cnt
+        return sum(1 for review in reviews_to_check if review.get("state") == "APPROVED")
 
     @staticmethod
     def is_changes_requested(pull_request: dict):
-        if "labels" not in pull_request:
-            return False
-        for labels in pull_request["labels"]:
-            if "pr/changes-requested" == labels["name"]:
-                return True
-        return False
+        return "pr/changes-requested" in PullRequestHandler.get_label_names(pull_request=pull_request)
 
     @staticmethod
     def check_labels_to_merge(pull_request: dict, blocking_labels: list) -> bool:
@@ -82,8 +80,7 @@ class PullRequestHandler:
         """
         if "labels" not in pull_request:
             return False
-        for label in pull_request["labels"]:
-            if label["name"] in blocking_labels:
-                return False
+        if not PullRequestHandler.get_label_names(pull_request=pull_request).isdisjoint(blocking_labels):
+            return False
         logger.debug(f"Add '{pull_request['number']}' to approved PRs.")
         return True
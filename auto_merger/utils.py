@@ -23,11 +23,9 @@ import json
 
 import subprocess
 import logging
-import tempfile
 import os
 
 from pathlib import Path
-from contextlib import contextmanager
 
 from auto_merger.config import Config
 
@@ -75,12 +73,6 @@ def run_command(
             raise cpe
 
 
-def temporary_dir(prefix: str = "automerger") -> str:
-    temp_file = tempfile.TemporaryDirectory(prefix=prefix)
-    logger.debug(f"Temporary dir name: {temp_file.name}")
-    return temp_file.name
-
-
 def check_mandatory_config_fields(config: Config) -> bool:
     config_correct: bool = True
     if config.github:
@@ -106,22 +98,6 @@ def check_mandatory_config_fields(config: Config) -> bool:
     return config_correct
 
 
-@contextmanager
-def cwd(path):
-    """
-    Switch to Path directory and once action is done
-    returns back
-    :param path:
-    :return:
-    """
-    prev_cwd = Path.cwd()
-    os.chdir(path)
-    try:
-        yield
-    finally:
-        os.chdir(prev_cwd)
-
-
 def get_realtime():
     from datetime import datetime
 
@@ -28,16 +28,6 @@ from auto_merger.named_tuples import ProjectMR
 from tests.spellbook import DATA_DIR
 
 
-@pytest.fixture()
-def get_repo_name():
-    return json.loads((DATA_DIR / "gh_repo_name.json").read_text())
-
-
-@pytest.fixture()
-def get_repo_wrong_name():
-    return json.loads((DATA_DIR / "gh_different_repo_name.json").read_text())
-
-
 @pytest.fixture()
 def get_pr_missing_ci():
     return json.loads((DATA_DIR / "pr_missing_ci.json").read_text())
@@ -73,6 +63,24 @@ def get_pr_missing_labels_one_approval():
     return json.loads((DATA_DIR / "pr_missing_labels_one_approval.json").read_text())
 
 
+def get_graphql_output(*repos_pull_requests):
+    """
+    Converts pull request lists in 'gh pr list' format into GraphQL response
+    with one 'r<index>' alias per repository. None means repository does not exist.
+    """
+    data = {}
+    for index, pull_requests in enumerate(repos_pull_requests):
+        if pull_requests is None:
+            data[f"r{index}"] = None
+            continue
+        nodes = [
+            dict(pr, labels={"nodes": pr.get("labels", [])}, reviews={"nodes": pr.get("reviews", [])})
+            for pr in pull_requests
+        ]
+        data[f"r{index}"] = {"pullRequests": {"nodes": nodes}}
+    return {"data": data}
+
+
 def get_config_dict_simple():
     return {
         "github": {
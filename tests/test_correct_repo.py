@@ -26,21 +26,20 @@ from flexmock import flexmock
 
 from auto_merger.config import Config
 from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.github_handler import GitHubHandler
 
-from tests.conftest import default_config_merger
+from tests.conftest import default_config_merger, get_graphql_output
 
 
-def test_get_gh_pr_correct_repo(get_repo_name):
-    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_repo_name)
+def test_get_gh_pr_correct_repo(get_pr_missing_ci):
+    flexmock(GitHubHandler).should_receive("graphql").and_return(get_graphql_output(get_pr_missing_ci))
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    assert auto_merger.is_correct_repo()
+    assert "s2i-nodejs-container" in auto_merger._graphql_fetch_all()
 
 
-def test_get_gh_pr_wrong_repo(get_repo_wrong_name):
-    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_repo_wrong_name)
+def test_get_gh_pr_wrong_repo():
+    flexmock(GitHubHandler).should_receive("graphql").and_return(get_graphql_output(None))
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    assert not auto_merger.is_correct_repo()
+    assert "s2i-nodejs-container" not in auto_merger._graphql_fetch_all()
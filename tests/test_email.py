@@ -21,6 +21,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import smtplib
+
+import pytest
+
+from flexmock import flexmock
 
 from auto_merger.email import EmailSender
 
@@ -43,3 +48,39 @@ def test_create_email_with_recipients():
     assert "sclorg@redhat.com" not in es.mime_msg["To"]
     assert "foo@bar.com" in es.mime_msg["To"]
     assert es.mime_msg["Subject"] == "something important"
+
+
+def test_create_email_duplicate_recipients():
+    es = EmailSender(recipient_email=["foo@bar.com", "foobar@test.com", "foo@bar.com"])
+    assert es.create_email_msg("something important")
+    assert es.send_to == ["foo@bar.com", "foobar@test.com"]
+    assert es.mime_msg["To"] == "foo@bar.com, foobar@test.com"
+
+
+def test_send_email_one_connection():
+    smtp = flexmock(sendmail=lambda send_from, send_to, msg: {})
+    smtp.should_receive("quit").once()
+    flexmock(smtplib).should_receive("SMTP").and_return(smtp).once()
+    with EmailSender(recipient_email=["foo@bar.com", "foobar@test.com"]) as es:
+        assert es.send_email("first", ["body"])
+        assert es.send_email("second", ["body"])
+        assert es.mime_msg["Subject"] == "second"
+
+
+@pytest.mark.parametrize(
+    "quit_error",
+    (
+        smtplib.SMTPServerDisconnected("quit"),
+        ConnectionResetError("quit"),
+    ),
+)
+def test_send_email_disconnected(quit_error):
+    smtp = flexmock()
+    smtp.should_receive("sendmail").and_raise(smtplib.SMTPServerDisconnected("sendmail"))
+    smtp.should_receive("quit").and_raise(quit_error)
+    smtp.should_receive("close").once()
+    flexmock(smtplib).should_receive("SMTP").and_return(smtp)
+    es = EmailSender(recipient_email=["foo@bar.com"])
+    with pytest.raises(smtplib.SMTPServerDisconnected, match="sendmail"):
+        es.send_email("subject", ["body"])
+    assert es._smtp is None
@@ -25,44 +25,159 @@ from flexmock import flexmock
 
 from auto_merger.config import Config
 from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.github_handler import GitHubHandler
 
-from tests.conftest import default_config_merger
+from tests.conftest import default_config_merger, get_graphql_output
+
+
+def test_get_graphql_query():
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    query = auto_merger.get_graphql_query()
+    assert query.startswith("query($owner: String!, $name0: String!) { r0: repository(owner: $owner, name: $name0)")
+    assert "r1:" not in query
+    assert "labels(first: 20) { nodes { name } }" in query
+    assert "reviews(first: 50) { nodes { state } }" in query
+
+
+def test_get_graphql_variables():
+    test_config = Config()
+    config_dict = dict(default_config_merger()["github"], namespace='foo"bar', repos=["s2i-nodejs-container", 'a\\b"'])
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict({"github": config_dict}))
+    assert 'foo"bar' not in auto_merger.get_graphql_query()
+    assert auto_merger.get_graphql_variables() == {
+        "owner": 'foo"bar',
+        "name0": "s2i-nodejs-container",
+        "name1": 'a\\b"',
+    }
 
 
 def test_get_gh_pr_list(get_pr_missing_ci):
-    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_pr_missing_ci)
+    flexmock(GitHubHandler).should_receive("graphql").and_return(get_graphql_output(get_pr_missing_ci))
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
-    assert auto_merger.repo_data
+    all_repo_data = auto_merger._graphql_fetch_all()
+    assert all_repo_data["s2i-nodejs-container"]
+    assert all_repo_data["s2i-nodejs-container"][0]["labels"] == get_pr_missing_ci[0]["labels"]
+
+
+def test_check_all_containers_graphql_without_data():
+    flexmock(GitHubHandler).should_receive("check_authentication").and_return(True)
+    flexmock(GitHubHandler).should_receive("graphql").and_return({"data": None, "errors": [{"type": "RATE_LIMITED"}]})
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    assert not auto_merger.check_all_containers()
+    assert auto_merger.blocked_pr == {}
 
 
 def test_get_gh_two_pr_labels_missing(get_two_pr_missing_labels):
-    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_two_pr_missing_labels)
+    flexmock(GitHubHandler).should_receive("graphql").and_return(get_graphql_output(get_two_pr_missing_labels))
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
     auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
+    auto_merger.blocked_pr[auto_merger.container_name] = []
+    auto_merger.pr_to_merge[auto_merger.container_name] = []
+    auto_merger.repo_data = auto_merger._graphql_fetch_all()["s2i-nodejs-container"]
     assert auto_merger.repo_data
-    assert not auto_merger.check_pr_to_merge()
+    assert not auto_merger.classify_prs()
 
 
 def test_get_gh_pr_missing_ci(get_pr_missing_ci):
-    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_pr_missing_ci)
+    flexmock(GitHubHandler).should_receive("graphql").and_return(get_graphql_output(get_pr_missing_ci))
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
     auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
+    auto_merger.blocked_pr[auto_merger.container_name] = []
+    auto_merger.pr_to_merge[auto_merger.container_name] = []
+    auto_merger.repo_data = auto_merger._graphql_fetch_all()["s2i-nodejs-container"]
     assert auto_merger.repo_data
-    assert not auto_merger.check_pr_to_merge()
+    assert not auto_merger.classify_prs()
 
 
 def test_get_no_pr_for_merge():
-    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return([])
+    flexmock(GitHubHandler).should_receive("graphql").and_return(get_graphql_output([]))
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
     auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
+    auto_merger.blocked_pr[auto_merger.container_name] = []
+    auto_merger.pr_to_merge[auto_merger.container_name] = []
+    auto_merger.repo_data = auto_merger._graphql_fetch_all()["s2i-nodejs-container"]
     assert not auto_merger.repo_data
-    assert not auto_merger.check_pr_to_merge()
+    assert not auto_merger.classify_prs()
+
+
+def test_classify_prs():
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    auto_merger.container_name = "s2i-nodejs-container"
+    auto_merger.blocked_pr[auto_merger.container_name] = []
+    auto_merger.pr_to_merge[auto_merger.container_name] = []
+    approved = [{"state": "APPROVED"}, {"state": "APPROVED"}]
+    auto_merger.repo_data = [
+        {"number": 1, "title": "blocked", "labels": [{"name": "pr/failing-ci"}], "reviews": approved},
+        {"number": 2, "title": "first", "labels": [], "reviews": approved},
+        {"number": 3, "title": "second", "labels": [{"name": "READY-to-MERGE"}], "reviews": approved},
+        {"number": 4, "title": "one approval", "labels": [], "reviews": approved[:1]},
+    ]
+    assert auto_merger.classify_prs()
+    assert [pr["number"] for pr in auto_merger.blocked_pr["s2i-nodejs-container"]] == [1]
+    assert auto_merger.pr_to_merge["s2i-nodejs-container"] == [
+        {"number": 2, "approvals": 2, "pr_dict": {"title": "first"}},
+        {"number": 3, "approvals": 2, "pr_dict": {"title": "second"}},
+    ]
+
+
+def test_add_blocked_pull_request_once():
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    auto_merger.container_name = "s2i-nodejs-container"
+    auto_merger.blocked_pr[auto_merger.container_name] = []
+    pull_request = {"number": 12, "title": "blocked", "labels": [{"name": "pr/failing-ci"}]}
+    auto_merger.add_blocked_pull_request(pull_request=pull_request)
+    auto_merger.add_blocked_pull_request(pull_request=dict(pull_request, title="blocked again"))
+    assert auto_merger.blocked_pr["s2i-nodejs-container"] == [pull_request]
+
+
+def test_print_approval_pull_request(caplog):
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    auto_merger.pr_to_merge = {
+        "s2i-nodejs-container": [
+            {"number": 2, "approvals": 2, "pr_dict": {"title": "first"}},
+            {"number": 3, "approvals": 1, "pr_dict": {"title": "second"}},
+        ],
+        "s2i-python-container": [],
+    }
+    auto_merger.print_approval_pull_request()
+    body = "".join(auto_merger.approval_body)
+    assert body.count("<table>") == 1
+    assert "https://github.com/foobar/s2i-nodejs-container/pull/2</td><td>first</td>" in body
+    assert "CAN BE MERGED" in body
+    assert "Missing 1 APPROVAL" in body
+    assert len(caplog.records) == 1
+    assert "https://github.com/foobar/s2i-nodejs-container/pull/3 - Missing 1 APPROVAL" in caplog.text
+
+
+def test_print_blocked_pull_request():
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    auto_merger.pr_to_merge = {"s2i-nodejs-container": []}
+    auto_merger.blocked_pr = {
+        "s2i-nodejs-container": [{"number": 1, "title": "blocked", "labels": [{"name": "pr/failing-ci"}]}],
+        "s2i-python-container": [],
+    }
+    assert auto_merger.print_blocked_pull_request()
+    assert len(auto_merger.blocked_body) == 1
+    body = auto_merger.blocked_body[0]
+    assert body.count("<table>") == 1
+    assert (
+        "<tr><td>https://github.com/foobar/s2i-nodejs-container/pull/1</td><td>blocked</td>"
+        "<td><p style='color:red;'>pr/failing-ci</p></td></tr>"
+    ) in body
+
+
+def test_get_blocked_labels():
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    pull_request = {"labels": [{"name": "pr/failing-ci"}, {"name": "P1"}, {"name": "pr/missing-review"}]}
+    assert auto_merger.get_blocked_labels(pull_request) == ["pr/missing-review", "pr/failing-ci"]
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+import requests
+
+from flexmock import flexmock
+
+from auto_merger.config import Config
+from auto_merger.github_handler import GitHubHandler
+
+from tests.conftest import default_config_merger
+
+
+def fake_response(status_code: int = 200, json_data=None, etag: str = ""):
+    response = requests.Response()
+    response.status_code = status_code
+    if etag:
+        response.headers["ETag"] = etag
+    flexmock(response).should_receive("json").and_return(json_data)
+    return response
+
+
+@pytest.mark.parametrize(
+    "token,status_code,expected_bool",
+    (
+        ("", 200, False),
+        ("foobar", 401, False),
+        ("foobar", 200, True),
+    ),
+)
+def test_check_authentication(monkeypatch, token, status_code, expected_bool):
+    monkeypatch.setenv("GH_TOKEN", token)
+    gh_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    flexmock(requests.Session).should_receive("get").and_return(fake_response(status_code, {"login": "foobar"}))
+    assert gh_handler.check_authentication() == expected_bool
+
+
+def test_get_pull_requests():
+    gh_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    pulls = [
+        {
+            "number": 12,
+            "title": "nodejs_title",
+            "draft": False,
+            "created_at": "2024-12-19T07:30:11Z",
+            "labels": [{"id": 1, "name": "READY-to-MERGE", "color": "ededed"}],
+            "user": {"login": "foobar"},
+        }
+    ]
+    flexmock(requests.Session).should_receive("get").with_args(
+        "https://api.github.com/repos/foobar/s2i-nodejs-container/pulls",
+        params={"state": "open", "per_page": 100},
+        headers={},
+    ).and_return(fake_response(200, pulls))
+    assert gh_handler.get_pull_requests(reponame="s2i-nodejs-container") == [
+        {
+            "number": 12,
+            "title": "nodejs_title",
+            "isDraft": False,
+            "createdAt": "2024-12-19T07:30:11Z",
+            "labels": [{"name": "READY-to-MERGE"}],
+        }
+    ]
+
+
+def test_get_pull_request_reviews():
+    gh_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    reviews = [{"id": 1, "state": "APPROVED", "body": "LGTM"}, {"id": 2, "state": "COMMENTED", "body": ""}]
+    flexmock(requests.Session).should_receive("get").and_return(fake_response(200, reviews))
+    assert gh_handler.get_pull_request_reviews(reponame="s2i-nodejs-container", number=12) == [
+        {"state": "APPROVED"},
+        {"state": "COMMENTED"},
+    ]
+
+
+def test_get_cached_not_modified():
+    gh_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    url = "https://api.github.com/repos/foobar/s2i-nodejs-container/pulls/12/reviews"
+    flexmock(requests.Session).should_receive("get").with_args(url, params={"per_page": 100}, headers={}).and_return(
+        fake_response(200, [{"id": 1, "state": "APPROVED"}], etag='"abc"')
+    ).once()
+    flexmock(requests.Session).should_receive("get").with_args(
+        url, params={"per_page": 100}, headers={"If-None-Match": '"abc"'}
+    ).and_return(fake_response(304)).once()
+    first = gh_handler.get_pull_request_reviews(reponame="s2i-nodejs-container", number=12)
+    assert gh_handler.etag_cache[url] == {"etag": '"abc"', "data": [{"state": "APPROVED"}]}
+    assert gh_handler.get_pull_request_reviews(reponame="s2i-nodejs-container", number=12) == first
+
+
+def test_get_cached_not_modified_without_cache():
+    gh_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    flexmock(requests.Session).should_receive("get").and_return(fake_response(304))
+    with pytest.raises(requests.HTTPError):
+        gh_handler.get_pull_request_reviews(reponame="s2i-nodejs-container", number=12)
+
+
+def test_etag_cache_save_load(tmp_path):
+    gh_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    gh_handler.etag_cache_file = tmp_path / "auto-merger" / "etags.json"
+    gh_handler.etag_cache = {
+        "https://api.github.com/foo": {"etag": '"abc"', "data": []},
+        "https://api.github.com/closed": {"etag": '"def"', "data": []},
+    }
+    gh_handler.used_urls = {"https://api.github.com/foo"}
+    assert gh_handler.save_etag_cache()
+    new_handler = GitHubHandler(config=Config.get_from_dict(default_config_merger()))
+    new_handler.etag_cache_file = gh_handler.etag_cache_file
+    new_handler.load_etag_cache()
+    assert new_handler.etag_cache == {"https://api.github.com/foo": {"etag": '"abc"', "data": []}}
@@ -60,3 +60,17 @@ def test_gl_check_all_containers(get_pr_missing_ci, merge_requests_psql_13):
     blocker_mr: dict = auto_merger.blocked_mr[auto_merger.config.gitlab["namespace"] + "/postgresql-13"][0]
     assert blocker_mr["number"] == p_mr.iid
     assert blocker_mr["title"] == p_mr.title
+
+
+def test_gl_check_blocked_labels(merge_requests_psql_13):
+    test_config = Config()
+    auto_merger = GitLabStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    auto_merger.container_name = "postgresql-13"
+    auto_merger.blocked_mr[auto_merger.container_name] = []
+    p_mr: ProjectMR = merge_requests_psql_13[0]
+    auto_merger.merge_requests = [
+        p_mr._replace(iid=1, labels=["pr/missing-review", "pr/failing-ci"]),
+        p_mr._replace(iid=2, labels=["READY-to-MERGE"]),
+    ]
+    auto_merger.check_blocked_labels()
+    assert [mr["number"] for mr in auto_merger.blocked_mr["postgresql-13"]] == [1]
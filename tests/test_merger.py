@@ -22,11 +22,13 @@
 # SOFTWARE.
 
 import pytest
+import requests
 
 from datetime import datetime
 from flexmock import flexmock
 
 from auto_merger.config import Config
+from auto_merger.github_handler import GitHubHandler
 from auto_merger.merger import AutoMerger
 from auto_merger import utils
 from auto_merger.pull_request_handler import PullRequestHandler
@@ -77,6 +79,31 @@ def test_get_approvals(review_data, return_code):
     assert PullRequestHandler.check_pr_approvals(reviews_to_check=review_data) == return_code
 
 
+@pytest.mark.parametrize(
+    "pull_request,return_code",
+    (
+        ({}, False),
+        ({"labels": [{"name": "pr/changes-requested"}]}, True),
+        ({"labels": [{"name": "READY-to-MERGE"}]}, False),
+        ({"labels": [], "_label_names": frozenset(["pr/changes-requested"])}, True),
+    ),
+)
+def test_is_changes_requested(pull_request, return_code):
+    assert PullRequestHandler.is_changes_requested(pull_request=pull_request) == return_code
+
+
+@pytest.mark.parametrize(
+    "pull_request,return_code",
+    (
+        ({}, False),
+        ({"isDraft": False}, False),
+        ({"isDraft": True}, True),
+    ),
+)
+def test_is_draft(pull_request, return_code):
+    assert PullRequestHandler.is_draft(pull_request=pull_request) == return_code
+
+
 @pytest.mark.parametrize(
     "pr_to_merge,return_code,approval_body",
     (
@@ -101,3 +128,59 @@ def test_print_pull_request_to_merge_success():
     }
     assert auto_merger.print_pull_request_to_merge() is True
     assert auto_merger.approval_body != []
+
+
+def test_check_all_containers():
+    pull_requests = {
+        "s2i-nodejs-container": [
+            {"number": 12, "title": "nodejs_title", "isDraft": False, "labels": [{"name": "READY-to-MERGE"}]},
+            {"number": 13, "title": "not_approved", "isDraft": False, "labels": [{"name": "READY-to-MERGE"}]},
+        ],
+        "s2i-python-container": [],
+    }
+    reviews = {
+        12: [{"state": "APPROVED"}, {"state": "APPROVED"}],
+        13: [{"state": "COMMENTED"}],
+    }
+    flexmock(GitHubHandler).should_receive("check_authentication").and_return(True)
+    flexmock(GitHubHandler).should_receive("load_etag_cache")
+    flexmock(GitHubHandler).should_receive("save_etag_cache")
+    flexmock(GitHubHandler).should_receive("get_pull_requests").replace_with(lambda reponame: pull_requests[reponame])
+    flexmock(GitHubHandler).should_receive("get_pull_request_reviews").replace_with(
+        lambda reponame, number: reviews[number]
+    )
+    test_config = Config()
+    config_dict = dict(yaml_merger["github"], repos=["s2i-nodejs-container", "s2i-python-container"])
+    auto_merger = AutoMerger(config=test_config.get_from_dict({"github": config_dict}))
+    assert auto_merger.check_all_containers()
+    assert list(auto_merger.pr_to_merge) == ["s2i-nodejs-container", "s2i-python-container"]
+    assert auto_merger.pr_to_merge["s2i-nodejs-container"] == [{"number": 12, "approvals": 2, "title": "nodejs_title"}]
+    assert auto_merger.pr_to_merge["s2i-python-container"] == []
+
+
+def test_check_all_containers_reviews_failed():
+    pull_requests = {
+        "s2i-nodejs-container": [
+            {"number": 12, "title": "nodejs_title", "isDraft": False, "labels": [{"name": "READY-to-MERGE"}]},
+        ],
+        "s2i-python-container": [
+            {"number": 14, "title": "python_title", "isDraft": False, "labels": [{"name": "READY-to-MERGE"}]},
+        ],
+    }
+
+    def get_reviews(reponame, number):
+        if reponame == "s2i-nodejs-container":
+            raise requests.HTTPError("502 Bad Gateway")
+        return [{"state": "APPROVED"}, {"state": "APPROVED"}]
+
+    flexmock(GitHubHandler).should_receive("check_authentication").and_return(True)
+    flexmock(GitHubHandler).should_receive("load_etag_cache")
+    flexmock(GitHubHandler).should_receive("save_etag_cache").once()
+    flexmock(GitHubHandler).should_receive("get_pull_requests").replace_with(lambda reponame: pull_requests[reponame])
+    flexmock(GitHubHandler).should_receive("get_pull_request_reviews").replace_with(get_reviews)
+    test_config = Config()
+    config_dict = dict(yaml_merger["github"], repos=["s2i-nodejs-container", "s2i-python-container"])
+    auto_merger = AutoMerger(config=test_config.get_from_dict({"github": config_dict}))
+    assert auto_merger.check_all_containers()
+    assert auto_merger.pr_to_merge["s2i-nodejs-container"] == []
+    assert auto_merger.pr_to_merge["s2i-python-container"] == [{"number": 14, "approvals": 2, "title": "python_title"}]